@@ -15,13 +15,17 @@ class AudioRecorderService {
     }
 
     func startRecording() throws {
-        let audioFilename = getDocumentsDirectory().appendingPathComponent("recording.m4a")
+        let audioFilename = getDocumentsDirectory().appendingPathComponent("recording.wav")
 
+        // Record uncompressed 16 kHz mono PCM, the exact format WhisperKit consumes, so
+        // transcription reads samples straight off disk with no AAC decode or resample.
         let settings: [String: Any] = [
-            AVFormatIDKey: Int(kAudioFormatMPEG4AAC),
+            AVFormatIDKey: Int(kAudioFormatLinearPCM),
             AVSampleRateKey: 16000,
             AVNumberOfChannelsKey: 1,
-            AVEncoderAudioQualityKey: AVAudioQuality.high.rawValue
+            AVLinearPCMBitDepthKey: 16,
+            AVLinearPCMIsFloatKey: false,
+            AVLinearPCMIsBigEndianKey: false
         ]
 
         audioRecorder = try AVAudioRecorder(url: audioFilename, settings: settings)
@@ -30,10 +30,15 @@ class SummarizationService {
         let response: String
     }
 
+    // Parsed and constructed once rather than on every summarize() call.
+    private static let endpoint = URL(string: "http://localhost:11434/api/generate")
+    private let encoder = JSONEncoder()
+    private let decoder = JSONDecoder()
+
     func summarize(text: String) async throws -> String {
         let prompt = "Summarize the following meeting transcript concisely:\n\n\(text)"
 
-        guard let url = URL(string: "http://localhost:11434/api/generate") else {
+        guard let url = Self.endpoint else {
             throw SummarizationError.invalidURL
         }
 
@@ -42,7 +47,7 @@ class SummarizationService {
         var request = URLRequest(url: url)
         request.httpMethod = "POST"
         request.setValue("application/json", forHTTPHeaderField: "Content-Type")
-        request.httpBody = try JSONEncoder().encode(requestBody)
+        request.httpBody = try encoder.encode(requestBody)
 
         let (data, response) = try await URLSession.shared.data(for: request)
 
@@ -55,7 +60,7 @@ class SummarizationService {
         }
 
         do {
-            let decoded = try JSONDecoder().decode(OllamaResponse.self, from: data)
+            let decoded = try decoder.decode(OllamaResponse.self, from: data)
             return decoded.response.trimmingCharacters(in: .whitespacesAndNewlines)
         } catch {
             throw SummarizationError.decodingError
@@ -1,39 +1,176 @@
 import Foundation
 import WhisperKit
 
-class TranscriptionService {
+// An actor so the shared model load and the transcription requests that wait on it,
+// issued from independent Tasks, never touch the service's state concurrently.
+actor TranscriptionService {
+    enum TranscriptionError: Error, LocalizedError {
+        case modelNotLoaded
+        case fileNotFound(URL)
+
+        var errorDescription: String? {
+            switch self {
+            case .modelNotLoaded: return "Model not loaded. Call loadModel() first."
+            case .fileNotFound(let url): return "Recording not found at \(url.path)."
+            }
+        }
+    }
+
+    // VAD chunking splits the recording at silence into windows of at most 30 s so WhisperKit
+    // can decode them concurrently. The default seek loop already used fixed 30 s windows, so
+    // the only gain is that concurrency. The cost: windows no longer carry prompt context from
+    // the previous window, and each window's text becomes its own line in the transcript.
+    // Peak memory is not reduced; the whole recording is decoded into one sample array
+    // (about 230 MB per hour at 16 kHz Float32).
+    private static let decodingOptions: DecodingOptions = {
+        var options = DecodingOptions()
+        options.chunkingStrategy = .vad
+        return options
+    }()
+
+    private static let modelRepo = "argmaxinc/whisperkit-coreml"
+    private static let modelVariant = "openai_whisper-base"
+    // Written into the model folder only after a download finishes, so a folder left
+    // behind by an interrupted download is never mistaken for a usable snapshot.
+    private static let downloadCompleteMarker = ".download-complete"
+
     private var whisperPipe: WhisperKit?
-    private var isLoading = false
+    // The in-flight (or finished) model load. Shared so the model is built exactly once
+    // per app session and any transcription requested mid-load simply waits for it.
+    // Checking and assigning it happen without a suspension point in between, so two
+    // concurrent loadModel() calls cannot both start a load.
+    private var loadTask: Task<WhisperKit, Error>?
 
     // CoreML models are highly optimized for Apple Silicon (M-series chips).
     // ggml-base.en offers a great balance of speed and accuracy for offline processing.
     func loadModel() async throws {
-        guard whisperPipe == nil && !isLoading else { return }
+        guard whisperPipe == nil else { return }
 
-        isLoading = true
-        defer { isLoading = false }
+        if let loadTask {
+            whisperPipe = try await loadTask.value
+            return
+        }
 
-        print("Initializing WhisperKit (CoreML Optimized)...")
-        // Initialize WhisperKit using a standard model repository.
-        // It will download and cache the model locally on first run.
-        whisperPipe = try await WhisperKit(modelRepo: "argmaxinc/whisperkit-coreml", modelFolder: "openai_whisper-base")
-        print("WhisperKit initialized successfully.")
+        let task = Task {
+            print("Initializing WhisperKit (CoreML Optimized)...")
+            let modelsDirectory = Self.modelsDirectory()
+            let (modelFolder, isFreshDownload) = try await Self.resolveModelFolder(in: modelsDirectory)
+            // The model and tokenizer are loaded from the pinned local snapshot, so launches
+            // after the first never block on (or fail without) the network.
+            // CoreML caches device specialization on any load. Prewarming (load, unload, reload)
+            // only helps bound peak memory during the first, uncached specialization, so it is
+            // skipped on every later launch.
+            let pipe = try await WhisperKit(
+                modelFolder: modelFolder.path,
+                tokenizerFolder: modelsDirectory,
+                prewarm: isFreshDownload,
+                download: false
+            )
+            await Self.warmUp(pipe)
+            print("WhisperKit initialized successfully.")
+            return pipe
+        }
+        loadTask = task
+
+        do {
+            whisperPipe = try await task.value
+        } catch {
+            // Allow a later call to retry instead of caching the failure forever.
+            loadTask = nil
+            throw error
+        }
     }
 
     func transcribe(fileURL: URL) async throws -> String {
-        guard let whisper = whisperPipe else {
-            throw NSError(domain: "TranscriptionService", code: 1, userInfo: [NSLocalizedDescriptionKey: "Model not loaded. Call loadModel() first."])
+        // Decode once into memory and hand WhisperKit the samples directly, so the
+        // CoreML inference engine on the Apple Neural Engine/GPU never re-reads the file.
+        let whisper: WhisperKit
+        let samples: [Float]
+        if let whisperPipe {
+            whisper = whisperPipe
+            samples = try await decodeAudio(fileURL: fileURL)
+        } else if let loadTask {
+            // A load is still in flight: overlap the decode with it. The decode only returns
+            // samples, so the overlap shares no state with the actor.
+            async let decodedSamples = decodeAudio(fileURL: fileURL)
+            whisper = try await loadTask.value
+            whisperPipe = whisper
+            samples = try await decodedSamples
+        } else {
+            // Fail before decoding; the GCD decode cannot be cancelled once started.
+            throw TranscriptionError.modelNotLoaded
         }
 
         print("Starting transcription for \(fileURL.lastPathComponent)")
 
-        // WhisperKit natively handles standard audio files, decodes them, and processes
-        // through the CoreML inference engine on the Apple Neural Engine/GPU.
-        let result = try await whisper.transcribe(audioPath: fileURL.path)
+        let result = try await whisper.transcribe(audioArray: samples, decodeOptions: Self.decodingOptions)
 
         // Return the full concatenated transcript
         let fullTranscript = result.map { $0.text }.joined(separator: "\n")
         print("Transcription complete.")
         return fullTranscript.trimmingCharacters(in: .whitespacesAndNewlines)
     }
+
+    // Decodes and resamples the file to the 16 kHz mono Float32 array WhisperKit expects.
+    // Samples are not retained past the request. It touches no actor state, so it is nonisolated.
+    // WhisperKit checks for the file itself and reports a missing one as a generic load
+    // failure, so that error is mapped to fileNotFound here; the stat runs only on failure.
+    nonisolated func loadAudio(fileURL: URL) throws -> [Float] {
+        do {
+            return try AudioProcessor.loadAudioAsFloatArray(fromPath: fileURL.path)
+        } catch {
+            if !FileManager.default.fileExists(atPath: fileURL.path) {
+                throw TranscriptionError.fileNotFound(fileURL)
+            }
+            throw error
+        }
+    }
+
+    // AVAudioFile decoding blocks for time proportional to the recording length, so it runs
+    // on a GCD queue instead of occupying one of the cooperative pool's few threads.
+    private nonisolated func decodeAudio(fileURL: URL) async throws -> [Float] {
+        try await withCheckedThrowingContinuation { continuation in
+            DispatchQueue.global(qos: .userInitiated).async {
+                continuation.resume(with: Result { try self.loadAudio(fileURL: fileURL) })
+            }
+        }
+    }
+
+    // Runs one second of silence through the full pipeline so the first real request
+    // doesn't pay for first-inference setup (ANE program load, decoder cache allocation).
+    // It uses the same options as real requests (VAD passes sub-window audio through as one
+    // chunk), but with no temperature fallback and a short sample length, so silence cannot
+    // trigger repeated re-decodes inside the user-visible load.
+    private static func warmUp(_ pipe: WhisperKit) async {
+        var options = decodingOptions
+        options.temperatureFallbackCount = 0
+        options.sampleLength = 16
+        let silence = [Float](repeating: 0, count: 16000)
+        _ = try? await pipe.transcribe(audioArray: silence, decodeOptions: options)
+    }
+
+    // App-local home for downloaded CoreML models and tokenizers.
+    static func modelsDirectory() -> URL {
+        let paths = FileManager.default.urls(for: .applicationSupportDirectory, in: .userDomainMask)
+        return paths[0].appendingPathComponent("LocalScribe/Models", isDirectory: true)
+    }
+
+    // Returns the local snapshot of the model variant, downloading it only if it
+    // is missing or incomplete, and whether this call performed the download.
+    private static func resolveModelFolder(in modelsDirectory: URL) async throws -> (folder: URL, isFreshDownload: Bool) {
+        let localFolder = modelsDirectory.appendingPathComponent("models/\(modelRepo)/\(modelVariant)", isDirectory: true)
+        if FileManager.default.fileExists(atPath: localFolder.appendingPathComponent(downloadCompleteMarker).path) {
+            return (localFolder, false)
+        }
+
+        // Anything already here is a partial download; start from a clean folder.
+        if FileManager.default.fileExists(atPath: localFolder.path) {
+            try FileManager.default.removeItem(at: localFolder)
+        }
+
+        print("Downloading \(modelVariant) to \(modelsDirectory.path)...")
+        let downloadedFolder = try await WhisperKit.download(variant: modelVariant, downloadBase: modelsDirectory, from: modelRepo)
+        try Data().write(to: downloadedFolder.appendingPathComponent(downloadCompleteMarker))
+        return (downloadedFolder, true)
+    }
 }
@@ -17,7 +17,7 @@ final class TranscriptionServiceTests: XCTestCase {
     }
 
     func testTranscribeWithoutModelThrowsError() async {
-        let dummyURL = URL(fileURLWithPath: "/tmp/fake.m4a")
+        let dummyURL = URL(fileURLWithPath: "/tmp/fake.wav")
 
         do {
             let _ = try await transcriptionService.transcribe(fileURL: dummyURL)
@@ -26,4 +26,33 @@ final class TranscriptionServiceTests: XCTestCase {
             XCTAssertTrue(error.localizedDescription.contains("Call loadModel() first"), "Error message should instruct to load model.")
         }
     }
+
+    func testLoadAudioMapsDecoderFailureForMissingFile() {
+        let missingURL = URL(fileURLWithPath: "/tmp/localscribe-missing-\(UUID().uuidString).wav")
+
+        // The decoder is the only existence check, so its failure must surface as fileNotFound.
+        XCTAssertThrowsError(try transcriptionService.loadAudio(fileURL: missingURL)) { error in
+            guard case .fileNotFound(let url)? = error as? TranscriptionService.TranscriptionError else {
+                return XCTFail("Expected fileNotFound, got \(error)")
+            }
+            XCTAssertEqual(url, missingURL)
+        }
+    }
+
+    func testLoadAudioPassesThroughDecoderFailureForExistingFile() throws {
+        let invalidURL = URL(fileURLWithPath: "/tmp/localscribe-invalid-\(UUID().uuidString).wav")
+        try Data("not audio".utf8).write(to: invalidURL)
+        defer { try? FileManager.default.removeItem(at: invalidURL) }
+
+        XCTAssertThrowsError(try transcriptionService.loadAudio(fileURL: invalidURL)) { error in
+            XCTAssertNil(error as? TranscriptionService.TranscriptionError, "Only a missing file should map to fileNotFound")
+        }
+    }
+
+    func testModelsDirectoryIsAppLocal() {
+        let url = TranscriptionService.modelsDirectory()
+        XCTAssertTrue(url.isFileURL, "Should return a valid file URL")
+        XCTAssertTrue(url.path.contains("Application Support"), "Models should be pinned under Application Support")
+        XCTAssertTrue(url.path.hasSuffix("LocalScribe/Models"), "Models should live in the app's own folder")
+    }
 }